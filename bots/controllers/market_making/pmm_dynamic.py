@@ -1,11 +1,11 @@
 from decimal import Decimal
-from typing import List, Set
+from typing import List, Optional, Set
 
 import pandas_ta as ta  # noqa: F401
 from pydantic import Field, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
-from hummingbot.core.data_type.common import PositionMode, TradeType
+from hummingbot.core.data_type.common import PositionMode, PriceType, TradeType
 from hummingbot.data_feed.candles_feed.data_types import CandlesConfig
 from hummingbot.strategy_v2.controllers.market_making_controller_base import (
     MarketMakingControllerBase,
@@ -14,6 +14,9 @@ from hummingbot.strategy_v2.controllers.market_making_controller_base import (
 from hummingbot.strategy_v2.executors.position_executor.data_types import PositionExecutorConfig
 from hummingbot.strategy_v2.models.executor_actions import CreateExecutorAction
 
+_DEC_ZERO = Decimal("0")
+_DEC_DEFAULT_TOLERANCE = Decimal("0.0001")
+
 
 class PMMDynamicControllerConfig(MarketMakingControllerConfigBase):
     controller_name: str = "pmm_dynamic"
@@ -90,44 +93,109 @@ class PMMDynamicController(MarketMakingControllerBase):
                 max_records=self.max_records
             )]
         super().__init__(config, *args, **kwargs)
+        macd_suffix = f"{config.macd_fast}_{config.macd_slow}_{config.macd_signal}"
+        self._macd_col = f"MACD_{macd_suffix}"
+        self._macdh_col = f"MACDh_{macd_suffix}"
+        # Bars needed before MACD (slow EMA + signal EMA) and NATR produce a value for the last bar
+        self._min_records = max(config.macd_slow + config.macd_signal, config.natr_length + 1)
+        self._warned_insufficient_candles = False
+        self._indicators_ready = False
+        self._last_bar_key = None
+        self._refresh_decimal_cache()
+
+    def update_config(self, new_config: PMMDynamicControllerConfig):
+        super().update_config(new_config)
+        self._refresh_decimal_cache()
+
+    def _refresh_decimal_cache(self):
+        # Config values only change through update_config, so convert them to Decimal once instead of per tick
+        tolerance = self._to_decimal(getattr(self.config, "position_rebalance_threshold_pct", None))
+        self._cached_tolerance = tolerance if tolerance != 0 else _DEC_DEFAULT_TOLERANCE
+        self._cached_target_pct = self._to_decimal(getattr(self.config, "target_base_pct", None))
+        self._cached_total_quote = self._to_decimal(getattr(self.config, "total_amount_quote", None))
+
+    @staticmethod
+    def _to_decimal(value) -> Decimal:
+        if isinstance(value, Decimal):
+            return value
+        if value is None:
+            return _DEC_ZERO
+        try:
+            return Decimal(str(value))
+        except Exception:
+            return _DEC_ZERO
 
     async def update_processed_data(self):
         candles = self.market_data_provider.get_candles_df(connector_name=self.config.candles_connector,
                                                            trading_pair=self.config.candles_trading_pair,
                                                            interval=self.config.interval,
                                                            max_records=self.max_records)
+        if len(candles) < self._min_records:
+            # Keep the previous processed_data instead of computing NaN indicators on a partial window
+            if not self._warned_insufficient_candles:
+                self.logger().warning(f"Not enough candles to compute indicators ({len(candles)}/{self._min_records}). "
+                                      f"Waiting for more data.")
+                self._warned_insufficient_candles = True
+            if "reference_price" not in self.processed_data:
+                # Nothing computed yet: seed neutral values so readers of processed_data don't hit missing keys.
+                # No executors are proposed until the indicators are ready
+                self.processed_data = {
+                    "reference_price": self._fallback_reference_price(candles),
+                    "spread_multiplier": 1.0,
+                    "features": candles
+                }
+            return
+        self._warned_insufficient_candles = False
+        # Indicators only change when the last bar does (new candle or an update of the live one)
+        bar_key = (candles["timestamp"].iat[-1], candles["high"].iat[-1],
+                   candles["low"].iat[-1], candles["close"].iat[-1])
+        if bar_key == self._last_bar_key:
+            return
+        self._last_bar_key = bar_key
 
-        # Создаем копию DataFrame чтобы избежать SettingWithCopyWarning
-        candles = candles.copy()
-
-        natr = ta.natr(candles["high"], candles["low"], candles["close"], length=self.config.natr_length) / 100
+        # pandas_ta dispatches to the TA-Lib C implementations when the library is installed
+        natr = ta.natr(candles["high"], candles["low"], candles["close"], length=self.config.natr_length,
+                       talib=True) / 100
         macd_output = ta.macd(candles["close"], fast=self.config.macd_fast,
-                              slow=self.config.macd_slow, signal=self.config.macd_signal)
-        macd = macd_output[f"MACD_{self.config.macd_fast}_{self.config.macd_slow}_{self.config.macd_signal}"]
-        macd_signal = - (macd - macd.mean()) / macd.std()
-        macdh = macd_output[f"MACDh_{self.config.macd_fast}_{self.config.macd_slow}_{self.config.macd_signal}"]
-        macdh_signal = macdh.apply(lambda x: 1 if x > 0 else -1)
-        max_price_shift = natr / 2
-        price_multiplier = ((0.5 * macd_signal + 0.5 * macdh_signal) * max_price_shift).iloc[-1]
-
-        # Теперь безопасно добавляем новые колонки
-        candles["spread_multiplier"] = natr
-        candles["reference_price"] = candles["close"] * (1 + price_multiplier)
+                              slow=self.config.macd_slow, signal=self.config.macd_signal, talib=True)
+        macd = macd_output[self._macd_col]
+        macdh = macd_output[self._macdh_col]
+        # Only the last bar feeds the price shift, so derive the signals as scalars instead of full Series
+        macd_signal = - (macd.iat[-1] - macd.mean()) / macd.std()
+        macdh_signal = 1 if macdh.iat[-1] > 0 else -1
+        natr_last = natr.iat[-1]
+        max_price_shift = natr_last / 2
+        price_multiplier = (0.5 * macd_signal + 0.5 * macdh_signal) * max_price_shift
+
+        # assign() builds the features frame without mutating the provider's DataFrame
+        features = candles.assign(spread_multiplier=natr,
+                                  reference_price=candles["close"] * (1 + price_multiplier))
 
+        # Kept as floats: MarketMakingControllerBase.get_price_and_amount converts them to Decimal when pricing levels
         self.processed_data = {
-            "reference_price": Decimal(candles["reference_price"].iloc[-1]),
-            "spread_multiplier": Decimal(candles["spread_multiplier"].iloc[-1]),
-            "features": candles
+            "reference_price": float(candles["close"].iat[-1] * (1 + price_multiplier)),
+            "spread_multiplier": float(natr_last),
+            "features": features
         }
+        self._indicators_ready = True
+
+    def _fallback_reference_price(self, candles) -> float:
+        if len(candles) > 0:
+            return float(candles["close"].iat[-1])
+        return float(self.market_data_provider.get_price_by_type(self.config.connector_name,
+                                                                 self.config.trading_pair, PriceType.MidPrice))
 
     def create_actions_proposal(self):
+        if not self._indicators_ready:
+            return []
         actions = super().create_actions_proposal()
         allowed_trade_types = self._resolve_allowed_trade_types(self._get_current_base_pct())
         filtered_actions = []
         for action in actions:
-            executor_config = getattr(action, "executor_config", None)
-            if isinstance(action, CreateExecutorAction) and executor_config is not None:
-                side = getattr(executor_config, "side", None)
+            if isinstance(action, CreateExecutorAction):
+                # Level executors are PositionExecutorConfig, the base class's rebalance orders OrderExecutorConfig;
+                # both carry a side. A config without one is passed through, as before
+                side = getattr(action.executor_config, "side", None)
                 if side is not None and side not in allowed_trade_types:
                     continue
             filtered_actions.append(action)
@@ -144,61 +212,50 @@ class PMMDynamicController(MarketMakingControllerBase):
                          if position.connector_name == self.config.connector_name and
                          position.trading_pair == self.config.trading_pair), None)
         if position is None:
-            return Decimal("0")
-        total_amount_quote = getattr(self.config, "total_amount_quote", None)
-        if total_amount_quote in (None, 0):
-            return Decimal("0")
-        try:
-            total_quote_decimal = Decimal(str(total_amount_quote))
-        except Exception:
-            total_quote_decimal = Decimal(total_amount_quote)
-        if total_quote_decimal == 0:
-            return Decimal("0")
-        return position.amount_quote / total_quote_decimal
+            return _DEC_ZERO
+        if self._cached_total_quote == 0:
+            return _DEC_ZERO
+        return position.amount_quote / self._cached_total_quote
 
     def _resolve_allowed_trade_types(self, current_pct: Decimal) -> Set[TradeType]:
         if self.config.position_mode != PositionMode.ONEWAY:
             return {TradeType.BUY, TradeType.SELL}
 
-        tolerance_value = getattr(self.config, "position_rebalance_threshold_pct", Decimal("0"))
-        if not isinstance(tolerance_value, Decimal):
-            try:
-                tolerance_value = Decimal(str(tolerance_value))
-            except Exception:
-                tolerance_value = Decimal("0")
-        if tolerance_value == Decimal("0"):
-            tolerance_value = Decimal("0.0001")
+        tolerance_value = self._cached_tolerance
+        target_pct = self._cached_target_pct
 
-        active_buy = any(self._executor_matches_side(info, TradeType.BUY) for info in self.executors_info if info.is_active)
-        active_sell = any(self._executor_matches_side(info, TradeType.SELL) for info in self.executors_info if info.is_active)
+        active_sides = set()
+        for info in self.executors_info:
+            if not info.is_active:
+                continue
+            side = self._executor_side(info)
+            if side is not None:
+                active_sides.add(side)
+                if len(active_sides) == 2:
+                    break
+        active_buy = TradeType.BUY in active_sides
+        active_sell = TradeType.SELL in active_sides
 
         if active_buy and not active_sell:
             return {TradeType.BUY}
         if active_sell and not active_buy:
             return {TradeType.SELL}
 
-        target_pct = getattr(self.config, "target_base_pct", Decimal("0"))
-        if not isinstance(target_pct, Decimal):
-            try:
-                target_pct = Decimal(str(target_pct))
-            except Exception:
-                target_pct = Decimal("0")
         if current_pct > target_pct + tolerance_value:
             return {TradeType.SELL}
         if current_pct < target_pct - tolerance_value:
             return {TradeType.BUY}
         return {TradeType.BUY, TradeType.SELL}
 
-    def _executor_matches_side(self, executor, trade_type: TradeType) -> bool:
+    def _executor_side(self, executor) -> Optional[TradeType]:
         custom_info = getattr(executor, "custom_info", {}) or {}
         level_id = custom_info.get("level_id") if isinstance(custom_info, dict) else None
         if isinstance(level_id, str) and "_" in level_id:
             try:
-                return self.get_trade_type_from_level_id(level_id) == trade_type
+                return self.get_trade_type_from_level_id(level_id)
             except Exception:
-                return False
-        executor_side = getattr(executor, "side", None)
-        return executor_side == trade_type
+                return None
+        return getattr(executor, "side", None)
 
     def get_executor_config(self, level_id: str, price: Decimal, amount: Decimal):
         trade_type = self.get_trade_type_from_level_id(level_id)
@@ -94,6 +94,20 @@ class AppSettings(BaseSettings):
         description="How often to update account states in minutes"
     )
 
+    # Backtesting diagnostics
+    debug_backtesting: bool = Field(
+        default=False,
+        description="Enable DEBUG logging for backtesting and performance metrics"
+    )
+    backtesting_process_workers: int = Field(
+        default=0,
+        description="Run /run-backtesting simulations in a pool of this many worker processes (0 runs them in the API process)"
+    )
+    batch_backtesting_max_concurrent: int = Field(
+        default=2,
+        description="Upper bound for max_concurrent of batch backtesting requests (each backtest holds its own engine)"
+    )
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -38,6 +38,8 @@ from services.accounts_service import AccountsService
 from services.docker_service import DockerService
 from services.market_data_feed_manager import MarketDataFeedManager
 from utils.bot_archiver import BotArchiver
+from services.telegram_service import telegram_service
+from utils.backtesting_runner import shutdown_backtesting_pool
 from routers import (
     accounts,
     archived_bots,
@@ -64,6 +66,12 @@ logging.basicConfig(
 # Enable debug logging for MQTT manager
 logging.getLogger('services.mqtt_manager').setLevel(logging.DEBUG)
 
+# Backtesting diagnostics are off by default; they are verbose on large backtests
+if settings.app.debug_backtesting:
+    for backtesting_logger in ('routers.backtesting', 'services.batch_backtesting_service', 'services.telegram_service',
+                               'utils.metrics_calculator'):
+        logging.getLogger(backtesting_logger).setLevel(logging.DEBUG)
+
 
 # Get settings from Pydantic Settings
 username = settings.security.username
@@ -147,6 +155,12 @@ async def lifespan(app: FastAPI):
     # Close database connections
     await accounts_service.db_manager.close()
 
+    # Stop backtesting worker processes
+    shutdown_backtesting_pool()
+
+    # Close Telegram HTTP connections
+    await telegram_service.close()
+
 
 # Initialize FastAPI with metadata and lifespan
 app = FastAPI(
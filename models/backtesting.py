@@ -1,5 +1,5 @@
 from typing import Dict, Union, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class BacktestingConfig(BaseModel):
@@ -7,7 +7,8 @@ class BacktestingConfig(BaseModel):
     end_time: int = 1738368000  # 2025-02-01 00:00:00
     backtesting_resolution: str = "1m"
     trade_cost: float = 0.0006
-    config: Union[Dict, str]
+    # Inline controller config or a YAML path relative to the controllers config directory
+    config: Union[Dict, str] = Field(union_mode="left_to_right")
 
 
 class BatchBacktestingConfig(BaseModel):
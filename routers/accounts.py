@@ -40,7 +40,7 @@ async def list_account_credentials(account_name: str,
     try:
         credentials = accounts_service.list_credentials(account_name)
         # Remove .yml extension from filenames
-        return [cred.replace('.yml', '') for cred in credentials]
+        return [cred.removesuffix('.yml') for cred in credentials]
     except HTTPException:
         raise
     except Exception as e:
@@ -1,21 +1,42 @@
+import asyncio
+import functools
+import json
 import logging
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
 import numpy as np
+import orjson
 from fastapi import APIRouter, HTTPException
-from hummingbot.data_feed.candles_feed.candles_factory import CandlesFactory
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from hummingbot.strategy_v2.backtesting.backtesting_engine_base import BacktestingEngineBase
 
 from config import settings
-from models.backtesting import BacktestingConfig, BatchBacktestingConfig, BatchBacktestingResult
+from models.backtesting import BacktestingConfig, BatchBacktestingConfig
 from services.telegram_service import telegram_service
 from services.batch_backtesting_service import batch_backtesting_service
+from utils.backtesting_runner import get_backtesting_pool, run_backtesting_sync
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["Backtesting"], prefix="/backtesting")
-candles_factory = CandlesFactory()
+# Backtesting payloads carry thousands of executors and feature values; orjson encodes them much faster
+router = APIRouter(tags=["Backtesting"], prefix="/backtesting", default_response_class=ORJSONResponse)
 backtesting_engine = BacktestingEngineBase()
 
+# Settings are loaded once at startup, so resolve the controller locations at import time
+_CONTROLLERS_PATH = settings.app.controllers_path
+_CONTROLLERS_MODULE = settings.app.controllers_module
+_PROCESS_WORKERS = settings.app.backtesting_process_workers
+
+# Strong references to in-flight notification tasks (the event loop only keeps weak ones)
+_background_tasks = set()
 
+# String fields that commonly arrive with stray whitespace
+_STRIPPED_FIELDS = frozenset(("connector_name", "strategy_name", "trading_pair", "exchange"))
 
 
 def _clean_config_data(config_data: dict) -> dict:
@@ -26,24 +47,105 @@ def _clean_config_data(config_data: dict) -> dict:
         config_data: Raw configuration dictionary
         
     Returns:
-        Cleaned configuration dictionary
+        Cleaned configuration dictionary (the input itself when nothing needs stripping)
     """
-    cleaned_config = config_data.copy()
-    
-    # Clean connector_name specifically
-    if 'connector_name' in cleaned_config:
-        cleaned_config['connector_name'] = cleaned_config['connector_name'].strip()
-        logger.info(f"Cleaned connector_name from '{config_data.get('connector_name')}' to '{cleaned_config['connector_name']}'")
-    
-    # Clean other string fields that might have whitespace issues
-    string_fields = ['strategy_name', 'trading_pair', 'exchange']
-    for field in string_fields:
-        if field in cleaned_config and isinstance(cleaned_config[field], str):
-            cleaned_config[field] = cleaned_config[field].strip()
+    # Only the fields actually present are checked
+    dirty_fields = [field for field in _STRIPPED_FIELDS & config_data.keys()
+                    if isinstance(config_data[field], str) and config_data[field] != config_data[field].strip()]
+    if not dirty_fields:
+        return config_data
     
+    cleaned_config = dict(config_data)
+    for field in dirty_fields:
+        cleaned_config[field] = cleaned_config[field].strip()
     return cleaned_config
 
 
+def _serialize_executors(executors: list) -> list:
+    """Convert executor infos to dictionaries."""
+    return [e.to_dict() for e in executors]
+
+
+def _serialize_features(features) -> dict:
+    """Convert the features DataFrame to the response's {column: {index: value}} dictionary."""
+    # fillna makes the only copy of the frame (it still belongs to the controller). JSON has no infinity and
+    # orjson would emit it as null, so ±inf is zero-filled like NaN, in place and only in float columns that have it
+    filled = features.fillna(0)
+    for column in filled.select_dtypes(include="floating").columns:
+        values = filled[column].to_numpy()
+        infinite = np.isinf(values)
+        if infinite.any():
+            filled[column] = np.where(infinite, 0.0, values)
+    return filled.to_dict()
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Encode the types orjson does not handle natively (executor Decimals, models)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return jsonable_encoder(obj)
+
+
+class BacktestingResponse(ORJSONResponse):
+    """ORJSONResponse that encodes Decimals itself and falls back to FastAPI's encoder for other types."""
+
+    def render(self, content: Any) -> bytes:
+        # The features dict is keyed by the frame's integer index
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _log_notification_failure(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Telegram notification failed: %s", task.exception())
+
+
+def _notify_in_background(coro):
+    """Schedule a Telegram notification without keeping the HTTP response waiting for it."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_log_notification_failure)
+
+
+@functools.lru_cache(maxsize=128)
+def _load_yml_controller_config(config_path: str, mtime: float, controllers_conf_dir_path: str,
+                                controllers_module: str):
+    """Parse and validate a controller YAML config; cached per file modification time."""
+    return backtesting_engine.get_controller_config_instance_from_yml(
+        config_path=config_path,
+        controllers_conf_dir_path=controllers_conf_dir_path,
+        controllers_module=controllers_module
+    )
+
+
+def _get_yml_controller_config(config_path: str):
+    """Return a controller config for a YAML file, re-reading it only when the file changed."""
+    try:
+        mtime = os.path.getmtime(os.path.join(_CONTROLLERS_PATH, config_path))
+    except OSError:
+        mtime = -1.0
+    controller_config = _load_yml_controller_config(config_path, mtime, _CONTROLLERS_PATH, _CONTROLLERS_MODULE)
+    # Controllers mutate their config (e.g. candles_config), so every run gets its own copy
+    return controller_config.model_copy(deep=True)
+
+
+@functools.lru_cache(maxsize=128)
+def _load_dict_controller_config(frozen_config: str, controllers_module: str):
+    """Validate a controller config given as canonical JSON; cached per config content."""
+    return backtesting_engine.get_controller_config_instance_from_dict(
+        config_data=json.loads(frozen_config),
+        controllers_module=controllers_module
+    )
+
+
+def _get_dict_controller_config(config_data: dict):
+    """Return a controller config for a dict config, validating each distinct config only once."""
+    frozen_config = json.dumps(config_data, sort_keys=True, default=str)
+    controller_config = _load_dict_controller_config(frozen_config, _CONTROLLERS_MODULE)
+    # Controllers mutate their config (e.g. candles_config), so every run gets its own copy
+    return controller_config.model_copy(deep=True)
+
+
 @router.post("/run-backtesting")
 async def run_backtesting(backtesting_config: BacktestingConfig):
     """
@@ -59,101 +161,62 @@ async def run_backtesting(backtesting_config: BacktestingConfig):
     Raises:
         Returns error dictionary if backtesting fails
     """
+    started_at = datetime.now()
+    started = time.monotonic()
     try:
-        # Log the incoming configuration for debugging
-        logger.info("=== INCOMING CONFIG DEBUG ===")
-        logger.info(f"Config type: {type(backtesting_config.config)}")
-        if isinstance(backtesting_config.config, dict):
-            logger.info(f"Config keys: {list(backtesting_config.config.keys())}")
-            if 'connector_name' in backtesting_config.config:
-                logger.info(f"Raw connector_name: '{backtesting_config.config['connector_name']}' (length: {len(backtesting_config.config['connector_name'])})")
-        logger.info("=== END INCOMING CONFIG DEBUG ===")
-        
-        # Send start notification
-        await telegram_service.send_simple_notification(
-            f"🚀 <b>Backtesting Started</b>\n\n"
-            f"📅 Period: {backtesting_config.start_time} - {backtesting_config.end_time}\n"
-            f"⏱️ Resolution: {backtesting_config.backtesting_resolution}\n"
-            f"💰 Trade Cost: {backtesting_config.trade_cost}"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Incoming backtesting config: type=%s, keys=%s", type(backtesting_config.config),
+                         list(backtesting_config.config) if isinstance(backtesting_config.config, dict) else None)
         
         # Clean and validate configuration
         if isinstance(backtesting_config.config, str):
-            controller_config = backtesting_engine.get_controller_config_instance_from_yml(
-                config_path=backtesting_config.config,
-                controllers_conf_dir_path=settings.app.controllers_path,
-                controllers_module=settings.app.controllers_module
-            )
+            cleaned_config = backtesting_config.config
+            controller_config = _get_yml_controller_config(cleaned_config)
         else:
             # Clean the configuration data to remove any whitespace issues
             cleaned_config = _clean_config_data(backtesting_config.config)
-            logger.info(f"Cleaned config connector_name: '{cleaned_config.get('connector_name', 'N/A')}'")
             
-            controller_config = backtesting_engine.get_controller_config_instance_from_dict(
-                config_data=cleaned_config,
-                controllers_module=settings.app.controllers_module
-            )
-        
-        backtesting_results = await backtesting_engine.run_backtesting(
-            controller_config=controller_config, trade_cost=backtesting_config.trade_cost,
-            start=int(backtesting_config.start_time), end=int(backtesting_config.end_time),
-            backtesting_resolution=backtesting_config.backtesting_resolution)
-        
-        # Log the raw backtesting results for debugging
-        logger.info("=== BACKTESTING RESULTS DEBUG ===")
-        logger.info(f"Type of backtesting_results: {type(backtesting_results)}")
-        logger.info(f"Keys in backtesting_results: {list(backtesting_results.keys()) if isinstance(backtesting_results, dict) else 'Not a dict'}")
-        
-        if isinstance(backtesting_results, dict):
-            for key, value in backtesting_results.items():
-                logger.info(f"Key '{key}': type={type(value)}, value={str(value)[:200]}...")
-                
-                # Special logging for processed_data
-                if key == "processed_data":
-                    logger.info(f"  processed_data type: {type(value)}")
-                    if isinstance(value, dict):
-                        logger.info(f"  processed_data keys: {list(value.keys())}")
-                        for sub_key, sub_value in value.items():
-                            logger.info(f"    {sub_key}: type={type(sub_value)}, shape={getattr(sub_value, 'shape', 'N/A') if hasattr(sub_value, 'shape') else 'N/A'}")
-                    elif hasattr(value, 'shape'):
-                        logger.info(f"  processed_data shape: {value.shape}")
-                
-                # Special logging for executors
-                elif key == "executors":
-                    logger.info(f"  executors type: {type(value)}")
-                    if isinstance(value, list):
-                        logger.info(f"  executors length: {len(value)}")
-                        if value:
-                            logger.info(f"  first executor type: {type(value[0])}")
-                            logger.info(f"  first executor methods: {[m for m in dir(value[0]) if not m.startswith('_')][:10]}")
-                
-                # Special logging for results
-                elif key == "results":
-                    logger.info(f"  results type: {type(value)}")
-                    if isinstance(value, dict):
-                        logger.info(f"  results keys: {list(value.keys())}")
-        
-        logger.info("=== END BACKTESTING RESULTS DEBUG ===")
-        
-        # Safely process the data with error handling
+            controller_config = _get_dict_controller_config(cleaned_config)
+        
+        if _PROCESS_WORKERS > 0:
+            # The simulation is CPU-bound Python: run it in a worker process so concurrent backtests
+            # execute in parallel and don't block the event loop
+            backtesting_results = await asyncio.get_running_loop().run_in_executor(
+                get_backtesting_pool(_PROCESS_WORKERS),
+                functools.partial(run_backtesting_sync, controller_config, backtesting_config.trade_cost,
+                                  int(backtesting_config.start_time), int(backtesting_config.end_time),
+                                  backtesting_config.backtesting_resolution))
+        else:
+            backtesting_results = await backtesting_engine.run_backtesting(
+                controller_config=controller_config, trade_cost=backtesting_config.trade_cost,
+                start=int(backtesting_config.start_time), end=int(backtesting_config.end_time),
+                backtesting_resolution=backtesting_config.backtesting_resolution)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Backtesting results keys: %s",
+                         list(backtesting_results) if isinstance(backtesting_results, dict) else type(backtesting_results))
+        
+        # Safely process the data with error handling; the pandas/pydantic conversions run in worker
+        # threads so large backtests don't block the event loop
         try:
             if "processed_data" in backtesting_results and backtesting_results["processed_data"]:
                 if "features" in backtesting_results["processed_data"]:
-                    processed_data = backtesting_results["processed_data"]["features"].fillna(0)
-                    processed_data_dict = processed_data.to_dict()
+                    processed_data_dict = await asyncio.to_thread(
+                        _serialize_features, backtesting_results["processed_data"]["features"])
                 else:
                     processed_data_dict = backtesting_results["processed_data"]
             else:
                 processed_data_dict = {}
         except Exception as e:
-            print(f"Warning: Error processing data: {e}")
+            logger.warning("Error processing data: %s", e)
             processed_data_dict = {}
         
         # Safely process executors
+        raw_executors = backtesting_results.get("executors", [])
         try:
-            executors_info = [e.to_dict() for e in backtesting_results.get("executors", [])]
+            executors_info = await asyncio.to_thread(_serialize_executors, raw_executors)
         except Exception as e:
-            print(f"Warning: Error processing executors: {e}")
+            logger.warning("Error processing executors: %s", e)
             executors_info = []
         
         # Safely process results
@@ -161,17 +224,17 @@ async def run_backtesting(backtesting_config: BacktestingConfig):
             results = backtesting_results.get("results", {})
             
             # Рассчитываем коэффициенты эффективности
-            from utils.metrics_calculator import calculate_performance_ratios
-            ratios = calculate_performance_ratios(results, executors_info)
+            from utils.metrics_calculator import calculate_performance_ratios, extract_returns
+            # Trade returns are read from the executor objects' net_pnl_pct (not the serialized dicts)
+            # in a worker thread, like the serialization above
+            returns = await asyncio.to_thread(extract_returns, raw_executors) if raw_executors else None
+            ratios = calculate_performance_ratios(results, returns=returns)
             
             # Обновляем результаты с рассчитанными коэффициентами
             results.update(ratios)
             
-            # Логируем обновленные результаты
-            logger.info(f"Updated results with calculated ratios: {list(results.keys())}")
-            
         except Exception as e:
-            print(f"Warning: Error processing results: {e}")
+            logger.warning("Error processing results: %s", e)
             results = {}
         
         # Prepare response with guaranteed structure
@@ -181,24 +244,32 @@ async def run_backtesting(backtesting_config: BacktestingConfig):
             "results": results,
         }
         
-        # Log the final response structure
-        logger.info("=== FINAL RESPONSE DEBUG ===")
-        logger.info(f"Response keys: {list(response_data.keys())}")
-        logger.info(f"executors length: {len(response_data['executors'])}")
-        logger.info(f"processed_data type: {type(response_data['processed_data'])}")
-        logger.info(f"results keys: {list(response_data['results'].keys())}")
-        logger.info("=== END FINAL RESPONSE DEBUG ===")
-        
-        # Send detailed summary to Telegram
-        config_dict = backtesting_config.dict()
-        await telegram_service.send_backtesting_summary(
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Backtesting response: %d executors, results keys: %s",
+                         len(executors_info), list(results))
+        
+        # Send detailed summary to Telegram in the background (a single message: the start time and duration
+        # replace a separate start notification); the report is built from the same objects as the response,
+        # which are not modified after this point
+        # Built from the fields directly instead of .dict(), which would deep-copy the controller config
+        config_dict = {
+            "start_time": backtesting_config.start_time,
+            "end_time": backtesting_config.end_time,
+            "backtesting_resolution": backtesting_config.backtesting_resolution,
+            "trade_cost": backtesting_config.trade_cost,
+            "config": cleaned_config,
+        }
+        _notify_in_background(telegram_service.send_backtesting_summary(
             config=config_dict,
             results=results,
             executors=executors_info,
-            processed_data=processed_data_dict
-        )
+            processed_data=processed_data_dict,
+            started_at=started_at,
+            duration=time.monotonic() - started
+        ))
         
-        return response_data
+        # Returned as a response object so FastAPI skips jsonable_encoder and the dicts go straight to orjson
+        return BacktestingResponse(response_data)
         
     except Exception as e:
         error_msg = str(e)
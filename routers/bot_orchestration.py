@@ -609,7 +609,7 @@ async def deploy_v2_script(
                     account_name=config.credentials_profile,
                     config_name=config.script_config,
                     image_version=config.image,
-                    deployment_config=config.dict()
+                    deployment_config=config.model_dump()
                 )
                 logger.info(f"Created bot run record for {config.instance_name}")
         except Exception as e:
@@ -702,7 +702,7 @@ async def deploy_v2_controllers(
                         account_name=deployment.credentials_profile,
                         config_name=script_config_filename,
                         image_version=deployment.image,
-                        deployment_config=deployment.dict()
+                        deployment_config=deployment.model_dump()
                     )
                     logger.info(f"Created bot run record for controller deployment {deployment.instance_name}")
             except Exception as e:
@@ -16,7 +16,6 @@ class BatchBacktestingService:
     
     def __init__(self):
         self.active_tasks: Dict[str, BatchBacktestingResult] = {}
-        self._semaphore = asyncio.Semaphore(2)  # Уменьшено до 2 одновременных бектестов для стабильности
         self.backtesting_engine = BacktestingEngineBase()
         self._startup_delay = 2.0  # Задержка между запусками бэктестов (секунды)
     
@@ -47,23 +46,26 @@ class BatchBacktestingService:
         result = self.active_tasks[task_id]
         result.status = "running"
         
-        # Создаем семафор для ограничения количества одновременных бектестов
-        # Ограничиваем максимум 2 для стабильности, даже если пользователь запросил больше
-        max_concurrent = min(config.max_concurrent or 2, 2)
+        # Создаем семафор для ограничения количества одновременных бектестов.
+        # Каждый бектест держит свой движок и свечи в памяти, а симуляция все равно выполняется в event loop,
+        # поэтому запрошенный max_concurrent ограничиваем сверху настройкой (по умолчанию 2 для стабильности)
+        max_concurrent = min(max(config.max_concurrent or 2, 1), settings.app.batch_backtesting_max_concurrent)
         semaphore = asyncio.Semaphore(max_concurrent)
         
-        # Создаем задачи для всех конфигураций
-        tasks = []
-        for i, config_item in enumerate(config.configs):
-            task = asyncio.create_task(
-                self._execute_single_backtesting_with_semaphore(
-                    semaphore, task_id, i, config_item, config
-                )
-            )
-            tasks.append(task)
+        # Свечи и торговые правила общие для всех конфигураций пакета (одинаковый период и разрешение):
+        # движки делят эти словари, чтобы данные загружались один раз на пакет, а не на каждый бектест.
+        # Кэш живет только пока выполняется пакет.
+        market_data_cache = {"candles_feeds": {}, "trading_rules": {}}
         
-        # Ждем завершения всех задач
-        await asyncio.gather(*tasks, return_exceptions=True)
+        # Запускаем все конфигурации в группе задач и ждем их завершения
+        # (ошибки отдельных бектестов перехватываются внутри и не отменяют остальные)
+        async with asyncio.TaskGroup() as task_group:
+            for i, config_item in enumerate(config.configs):
+                task_group.create_task(
+                    self._execute_single_backtesting_with_semaphore(
+                        semaphore, task_id, i, config_item, config, market_data_cache
+                    )
+                )
         
         # Обновляем статус
         if result.failed_configs == 0:
@@ -83,7 +85,8 @@ class BatchBacktestingService:
         task_id: str, 
         config_index: int, 
         config_item, 
-        batch_config: BatchBacktestingConfig
+        batch_config: BatchBacktestingConfig,
+        market_data_cache: Dict[str, dict]
     ):
         """Выполняет один бектест с ограничением семафора"""
         async with semaphore:
@@ -91,14 +94,15 @@ class BatchBacktestingService:
             if config_index > 0:
                 await asyncio.sleep(self._startup_delay)
             
-            await self._execute_single_backtesting(task_id, config_index, config_item, batch_config)
+            await self._execute_single_backtesting(task_id, config_index, config_item, batch_config, market_data_cache)
     
     async def _execute_single_backtesting(
         self, 
         task_id: str, 
         config_index: int, 
         config_item, 
-        batch_config: BatchBacktestingConfig
+        batch_config: BatchBacktestingConfig,
+        market_data_cache: Dict[str, dict]
     ):
         """Выполняет один бектест"""
         result = self.active_tasks[task_id]
@@ -123,8 +127,10 @@ class BatchBacktestingService:
                     controllers_module=settings.app.controllers_module
                 )
             
-            # Запускаем бектест
-            backtesting_results = await self.backtesting_engine.run_backtesting(
+            # Запускаем бектест на отдельном движке: BacktestingEngineBase хранит состояние прогона
+            # (controller, data provider), и общий экземпляр нельзя использовать параллельно
+            backtesting_engine = self._create_engine(market_data_cache)
+            backtesting_results = await backtesting_engine.run_backtesting(
                 controller_config=controller_config,
                 trade_cost=batch_config.trade_cost,
                 start=int(batch_config.start_time),
@@ -140,8 +146,10 @@ class BatchBacktestingService:
                     executors_data = backtesting_results.get("executors", [])
                     
                     # Вызываем функцию расчета метрик (как в обычном бэктестинге)
-                    from utils.metrics_calculator import calculate_performance_ratios
-                    ratios = calculate_performance_ratios(results_data, executors_data)
+                    from utils.metrics_calculator import calculate_performance_ratios, extract_returns
+                    # Доходности сделок извлекаются в рабочем потоке, чтобы не задерживать параллельные бэктесты
+                    returns = await asyncio.to_thread(extract_returns, executors_data) if executors_data else None
+                    ratios = calculate_performance_ratios(results_data, returns=returns)
                     
                     # Обновляем результаты с рассчитанными коэффициентами
                     results_data.update(ratios)
@@ -185,6 +193,15 @@ class BatchBacktestingService:
         total_processed = result.completed_configs + result.failed_configs
         result.progress_percentage = (total_processed / result.total_configs) * 100.0
     
+    @staticmethod
+    def _create_engine(market_data_cache: Dict[str, dict]) -> BacktestingEngineBase:
+        """Создает движок, data provider которого использует общий кэш свечей и торговых правил пакета"""
+        backtesting_engine = BacktestingEngineBase()
+        data_provider = backtesting_engine.backtesting_data_provider
+        data_provider.candles_feeds = market_data_cache["candles_feeds"]
+        data_provider.trading_rules = market_data_cache["trading_rules"]
+        return backtesting_engine
+
     def _clean_config_data(self, config_data: dict) -> dict:
         """Очищает данные конфигурации от лишних пробелов"""
         cleaned_config = {}
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import BaseModel
+
+pytest.importorskip("hummingbot")
+
+from routers import backtesting  # noqa: E402
+
+
+def test_router_has_single_run_backtesting_post_route():
+    routes = [route for route in backtesting.router.routes
+              if route.path == "/backtesting/run-backtesting" and "POST" in route.methods]
+    assert len(routes) == 1
+
+
+class _ControllerConfig(BaseModel):
+    controller_name: str
+    candles_config: list = []
+
+
+@pytest.fixture
+def yml_loads(monkeypatch, tmp_path):
+    calls = []
+
+    def load(config_path, controllers_conf_dir_path, controllers_module):
+        calls.append(config_path)
+        return _ControllerConfig(controller_name=config_path)
+
+    monkeypatch.setattr(backtesting, "_CONTROLLERS_PATH", str(tmp_path))
+    monkeypatch.setattr(backtesting.backtesting_engine, "get_controller_config_instance_from_yml", load)
+    backtesting._load_yml_controller_config.cache_clear()
+    yield calls
+    backtesting._load_yml_controller_config.cache_clear()
+
+
+def test_yml_controller_config_is_loaded_once_per_file_version(yml_loads, tmp_path):
+    config_file = tmp_path / "pmm.yml"
+    config_file.write_text("controller_name: pmm\n")
+
+    first = backtesting._get_yml_controller_config("pmm.yml")
+    second = backtesting._get_yml_controller_config("pmm.yml")
+    assert yml_loads == ["pmm.yml"]
+
+    os.utime(config_file, ns=(1_000_000_000, 1_000_000_000))
+    backtesting._get_yml_controller_config("pmm.yml")
+    assert yml_loads == ["pmm.yml", "pmm.yml"]
+
+    assert first is not second
+    first.candles_config.append("BTC-USDT")
+    assert second.candles_config == []
+
+
+@pytest.fixture
+def dict_loads(monkeypatch):
+    calls = []
+
+    def load(config_data, controllers_module):
+        calls.append(config_data)
+        return _ControllerConfig(**config_data)
+
+    monkeypatch.setattr(backtesting.backtesting_engine, "get_controller_config_instance_from_dict", load)
+    backtesting._load_dict_controller_config.cache_clear()
+    yield calls
+    backtesting._load_dict_controller_config.cache_clear()
+
+
+def test_dict_controller_config_is_validated_once_per_content(dict_loads):
+    first = backtesting._get_dict_controller_config({"controller_name": "pmm", "candles_config": []})
+    # Same content in another key order hits the cache
+    second = backtesting._get_dict_controller_config({"candles_config": [], "controller_name": "pmm"})
+    assert len(dict_loads) == 1
+
+    backtesting._get_dict_controller_config({"controller_name": "dman", "candles_config": []})
+    assert len(dict_loads) == 2
+
+    assert first is not second
+    first.candles_config.append("BTC-USDT")
+    assert second.candles_config == []
+
+
+def test_features_are_zero_filled_without_touching_the_controller_frame():
+    features = pd.DataFrame({"close": [1.0, np.inf, np.nan, -np.inf], "timestamp": [1, 2, 3, 4]})
+    original = features.copy()
+
+    serialized = backtesting._serialize_features(features)
+
+    assert serialized == {"close": {0: 1.0, 1: 0.0, 2: 0.0, 3: 0.0}, "timestamp": {0: 1, 1: 2, 2: 3, 3: 4}}
+    pd.testing.assert_frame_equal(features, original)
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("hummingbot")
+
+from utils import backtesting_runner  # noqa: E402
+
+
+class _FakeEngine:
+    instances = 0
+
+    def __init__(self):
+        _FakeEngine.instances += 1
+        self.loops = []
+
+    async def run_backtesting(self, controller_config, trade_cost, start, end, backtesting_resolution):
+        self.loops.append(asyncio.get_running_loop())
+        return {"controller_config": controller_config, "start": start, "end": end}
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    _FakeEngine.instances = 0
+    monkeypatch.setattr(backtesting_runner, "BacktestingEngineBase", _FakeEngine)
+    monkeypatch.setattr(backtesting_runner, "_worker_engine", None)
+    monkeypatch.setattr(backtesting_runner, "_worker_loop", None)
+    yield backtesting_runner
+    if backtesting_runner._worker_loop is not None:
+        backtesting_runner._worker_loop.close()
+    asyncio.set_event_loop(None)
+
+
+def test_worker_reuses_engine_and_event_loop(worker):
+    first = worker.run_backtesting_sync("config", 0.0006, 1, 2, "1m")
+    second = worker.run_backtesting_sync("config", 0.0006, 3, 4, "1m")
+
+    assert first == {"controller_config": "config", "start": 1, "end": 2}
+    assert second["start"] == 3
+    assert _FakeEngine.instances == 1
+    loops = worker._worker_engine.loops
+    assert loops[0] is loops[1]
+    assert not loops[0].is_closed()
+
+
+def test_backtesting_pool_is_shared_until_shutdown(monkeypatch):
+    monkeypatch.setattr(backtesting_runner, "_pool", None)
+    pool = backtesting_runner.get_backtesting_pool(1)
+    try:
+        assert backtesting_runner.get_backtesting_pool(1) is pool
+    finally:
+        backtesting_runner.shutdown_backtesting_pool()
+    assert backtesting_runner._pool is None
@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+pytest.importorskip("hummingbot")
+
+from hummingbot.client.config.config_crypt import PASSWORD_VERIFICATION_WORD  # noqa: E402
+
+from utils import security  # noqa: E402
+from utils.security import BackendAPISecurity  # noqa: E402
+
+
+@pytest.fixture
+def credentials(monkeypatch, tmp_path):
+    monkeypatch.setattr(security.fs_util, "base_path", str(tmp_path))
+    monkeypatch.setattr(BackendAPISecurity, "_secure_configs", {})
+    monkeypatch.setattr(BackendAPISecurity, "_config_cache", {})
+    monkeypatch.setattr(BackendAPISecurity, "_config_cache_secrets_manager", None)
+    monkeypatch.setattr(BackendAPISecurity, "secrets_manager", object())
+    connectors = tmp_path / "credentials" / "master_account" / "connectors"
+    connectors.mkdir(parents=True)
+    return connectors
+
+
+@pytest.fixture
+def decrypted(monkeypatch):
+    loads = []
+
+    def load_connector_config_map_from_file(cls, yml_path):
+        loads.append(yml_path.name)
+        return {"file": yml_path.name, "load": len(loads)}
+
+    monkeypatch.setattr(BackendAPISecurity, "load_connector_config_map_from_file",
+                        classmethod(load_connector_config_map_from_file))
+    return loads
+
+
+def test_decrypt_all_decrypts_only_changed_files(credentials, decrypted):
+    (credentials / "binance.yml").write_text("connector: binance\n")
+    (credentials / "kucoin.yml").write_text("connector: kucoin\n")
+    (credentials / "notes.txt").write_text("not a connector\n")
+
+    BackendAPISecurity.decrypt_all()
+    assert sorted(decrypted) == ["binance.yml", "kucoin.yml"]
+    assert sorted(BackendAPISecurity._secure_configs) == ["binance", "kucoin"]
+
+    BackendAPISecurity.decrypt_all()
+    assert len(decrypted) == 2
+    assert sorted(BackendAPISecurity._secure_configs) == ["binance", "kucoin"]
+
+    os.utime(credentials / "kucoin.yml", ns=(1_000_000_000, 1_000_000_000))
+    BackendAPISecurity.decrypt_all()
+    assert sorted(decrypted) == ["binance.yml", "kucoin.yml", "kucoin.yml"]
+    assert BackendAPISecurity._secure_configs["kucoin"]["load"] == 3
+
+
+def test_decrypt_all_drops_cache_for_another_secrets_manager(credentials, decrypted, monkeypatch):
+    (credentials / "binance.yml").write_text("connector: binance\n")
+    BackendAPISecurity.decrypt_all()
+
+    monkeypatch.setattr(BackendAPISecurity, "secrets_manager", object())
+    BackendAPISecurity.decrypt_all()
+    assert decrypted == ["binance.yml", "binance.yml"]
+
+
+class _SecretsManager:
+    def __init__(self, valid=True):
+        self.valid = valid
+        self.decrypted = []
+
+    def decrypt_secret_value(self, attr, value):
+        self.decrypted.append(value)
+        if not self.valid:
+            raise ValueError("MAC mismatch")
+        return PASSWORD_VERIFICATION_WORD
+
+
+@pytest.fixture
+def verification_file(monkeypatch, tmp_path):
+    path = tmp_path / ".password_verification"
+    path.write_text("encrypted-word")
+    monkeypatch.setattr(security.settings.app, "password_verification_path", str(path))
+    monkeypatch.setattr(BackendAPISecurity, "_verification_cache", None)
+    monkeypatch.setattr(BackendAPISecurity, "_validated_password", None)
+    return path
+
+
+def test_validate_password_rereads_the_verification_word_only_when_it_changes(verification_file):
+    secrets_manager = _SecretsManager()
+    assert BackendAPISecurity.validate_password(secrets_manager)
+    assert BackendAPISecurity.validate_password(secrets_manager)
+    assert secrets_manager.decrypted == ["encrypted-word"]
+
+    verification_file.write_text("new-encrypted-word")
+    assert BackendAPISecurity.validate_password(secrets_manager)
+    assert secrets_manager.decrypted == ["encrypted-word", "new-encrypted-word"]
+
+
+def test_validate_password_rechecks_other_and_failed_secrets_managers(verification_file):
+    assert BackendAPISecurity.validate_password(_SecretsManager())
+
+    other = _SecretsManager()
+    assert BackendAPISecurity.validate_password(other)
+    assert other.decrypted == ["encrypted-word"]
+
+    wrong = _SecretsManager(valid=False)
+    assert not BackendAPISecurity.validate_password(wrong)
+    assert not BackendAPISecurity.validate_password(wrong)
+    assert len(wrong.decrypted) == 2
@@ -0,0 +1,192 @@
+import asyncio
+import tempfile
+import zipfile
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("hummingbot")
+telegram_error = pytest.importorskip("telegram.error")
+
+from services.telegram_service import TelegramService  # noqa: E402
+
+
+class _FakeRequest:
+    async def shutdown(self):
+        pass
+
+
+class _FakeBot:
+    def __init__(self):
+        self.request = _FakeRequest()
+        self.messages = []
+        self.documents = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def send_message(self, chat_id, text, parse_mode):
+        await self.release.wait()
+        self.messages.append(text)
+        return SimpleNamespace(message_id=len(self.messages))
+
+    async def send_document(self, chat_id, document, reply_to_message_id):
+        self.documents.append((document.filename, reply_to_message_id))
+
+
+def _make_service() -> TelegramService:
+    service = TelegramService()
+    service.bot = _FakeBot()
+    service.chat_id = "chat"
+    service.enabled = True
+    return service
+
+
+async def _report_file():
+    return tempfile.SpooledTemporaryFile(), ".zip"
+
+
+def test_lone_report_is_sent_without_waiting_for_the_flush_interval():
+    async def scenario():
+        service = _make_service()
+        service.REPORT_FLUSH_INTERVAL = 30.0
+        delivered = await asyncio.wait_for(service._enqueue_report("summary", None, None), timeout=1.0)
+        await service.close()
+        return delivered, service.bot.messages
+
+    assert asyncio.run(scenario()) == (True, ["summary"])
+
+
+def test_queued_reports_are_sent_with_their_files_as_replies():
+    async def scenario():
+        service = _make_service()
+        service.REPORT_FLUSH_INTERVAL = 0.05
+        results = await asyncio.gather(*(
+            service._enqueue_report(f"summary {i}", asyncio.create_task(_report_file()), f"report_{i}")
+            for i in range(3)
+        ))
+        await service.close()
+        return results, service.bot
+
+    results, bot = asyncio.run(scenario())
+    assert results == [True, True, True]
+    assert sorted(bot.messages) == ["summary 0", "summary 1", "summary 2"]
+    assert sorted(filename for filename, _ in bot.documents) == ["report_0.zip", "report_1.zip", "report_2.zip"]
+
+
+def test_close_resolves_queued_and_in_flight_reports():
+    async def scenario():
+        service = _make_service()
+        service.bot.release.clear()
+        report_task = asyncio.create_task(_report_file())
+        callers = [asyncio.create_task(service._enqueue_report("in flight", None, None))]
+        await asyncio.sleep(0.01)
+        callers.append(asyncio.create_task(service._enqueue_report("queued", report_task, "report")))
+        await asyncio.sleep(0.01)
+
+        await service.close()
+        results = await asyncio.wait_for(asyncio.gather(*callers), timeout=1.0)
+        report_file, _ = await report_task
+        await asyncio.sleep(0)
+        return results, report_file.closed, service._report_pool
+
+    results, file_closed, report_pool = asyncio.run(scenario())
+    assert results == [False, False]
+    assert file_closed
+    with pytest.raises(RuntimeError):
+        report_pool.submit(print)
+
+
+async def _wait_for_messages(bot: _FakeBot, count: int):
+    while len(bot.messages) < count:
+        await asyncio.sleep(0.001)
+
+
+def test_simple_notification_is_queued_and_delivered_in_background():
+    async def scenario():
+        service = _make_service()
+        service.bot.release.clear()
+        queued = await asyncio.wait_for(service.send_simple_notification("hello"), timeout=1.0)
+        service.bot.release.set()
+        await asyncio.wait_for(_wait_for_messages(service.bot, 1), timeout=1.0)
+        await service.close()
+        return queued, service.bot.messages
+
+    assert asyncio.run(scenario()) == (True, ["hello"])
+
+
+def test_simple_notification_is_rejected_when_disabled():
+    async def scenario():
+        service = _make_service()
+        service.enabled = False
+        return await service.send_simple_notification("hello")
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_full_notification_queue_drops_the_oldest_message(monkeypatch):
+    monkeypatch.setattr(TelegramService, "NOTIFICATION_QUEUE_SIZE", 2)
+
+    async def scenario():
+        service = _make_service()
+        for message in ("first", "second", "third"):
+            await service.send_simple_notification(message)
+        await asyncio.wait_for(_wait_for_messages(service.bot, 2), timeout=1.0)
+        await service.close()
+        return service.bot.messages
+
+    assert asyncio.run(scenario()) == ["second", "third"]
+
+
+def test_notifications_are_rate_limited(monkeypatch):
+    monkeypatch.setattr(TelegramService, "NOTIFICATION_RATE", 20.0)
+
+    async def scenario():
+        service = _make_service()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(25):
+            await service.send_simple_notification(str(i))
+        await asyncio.wait_for(_wait_for_messages(service.bot, 25), timeout=2.0)
+        elapsed = loop.time() - started
+        await service.close()
+        return elapsed
+
+    # The bucket holds 20 tokens; the other 5 messages wait for a refill at 20 per second
+    assert asyncio.run(scenario()) >= 0.2
+
+
+def test_notification_is_retried_after_flood_control():
+    async def scenario():
+        service = _make_service()
+        send_message = service.bot.send_message
+        attempts = []
+
+        async def flaky_send_message(chat_id, text, parse_mode):
+            attempts.append(text)
+            if len(attempts) == 1:
+                raise telegram_error.RetryAfter(0)
+            return await send_message(chat_id, text, parse_mode)
+
+        service.bot.send_message = flaky_send_message
+        await service.send_simple_notification("hello")
+        await asyncio.wait_for(_wait_for_messages(service.bot, 1), timeout=1.0)
+        await service.close()
+        return attempts, service.bot.messages
+
+    assert asyncio.run(scenario()) == (["hello", "hello"], ["hello"])
+
+
+@pytest.mark.parametrize("signal, member", [
+    ((0.5, 0.7), "timeseries.parquet"),
+    ((Decimal("0.5"), "n/a"), "timeseries.csv"),
+])
+def test_report_timeseries_falls_back_to_csv_when_arrow_cannot_type_it(signal, member):
+    processed_data = {"features": {"timestamp": {0: 1, 1: 2}, "signal": dict(enumerate(signal))}}
+    report_file, extension = _make_service()._create_backtest_report(
+        {}, {}, [], processed_data, "pmm", "period", "now")
+
+    with zipfile.ZipFile(report_file) as zf:
+        assert member in zf.namelist()
+        assert member in zf.read("README.txt").decode()
+    assert extension == ".zip"
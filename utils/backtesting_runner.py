@@ -0,0 +1,46 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from hummingbot.strategy_v2.backtesting.backtesting_engine_base import BacktestingEngineBase
+
+# One engine per worker process: runs in a worker are sequential, and its data provider
+# keeps the downloaded candles between runs like the API's shared engine does.
+# The engine lives as long as the worker, so it also gets one event loop for its whole life:
+# asyncio.run() would close the loop after each run and strand loop-bound state (e.g. candle feed sessions)
+_worker_engine: Optional[BacktestingEngineBase] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def run_backtesting_sync(controller_config, trade_cost: float, start: int, end: int,
+                         backtesting_resolution: str) -> dict:
+    """Run a backtest to completion in the current process (entry point for pool workers)."""
+    global _worker_engine, _worker_loop
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    if _worker_engine is None:
+        _worker_engine = BacktestingEngineBase()
+    return _worker_loop.run_until_complete(_worker_engine.run_backtesting(
+        controller_config=controller_config, trade_cost=trade_cost,
+        start=start, end=end, backtesting_resolution=backtesting_resolution))
+
+
+def get_backtesting_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Return the shared backtesting process pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        # spawn: forking the API process would copy its event loop and service threads into the workers
+        _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_backtesting_pool():
+    """Stop the backtesting worker processes if the pool was started."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,11 +1,14 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
+import yaml
 from hummingbot.client.config.config_crypt import PASSWORD_VERIFICATION_WORD, BaseSecretsManager
 from hummingbot.client.config.config_helpers import (
     ClientConfigAdapter,
     connector_name_from_file,
     get_connector_hb_config,
-    read_yml_file,
     update_connector_hb_config,
 )
 from hummingbot.client.config.security import Security
@@ -14,8 +17,27 @@ from config import settings
 from utils.hummingbot_api_config_adapter import HummingbotAPIConfigAdapter
 from utils.file_system import fs_util
 
+# libyaml's C loader when PyYAML was built with it: several times faster than the pure-Python SafeLoader
+_YamlSafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _read_yml_file(yml_path: Path) -> Dict[str, Any]:
+    """Same as hummingbot's read_yml_file, parsed with the C safe loader if available."""
+    with open(yml_path, "r", encoding="utf-8") as file:
+        data = yaml.load(file, Loader=_YamlSafeLoader) or {}
+    return dict(data)
+
 
 class BackendAPISecurity(Security):
+    # Connector name and decrypted config by (account_name, file name), tagged with the file's (st_mtime_ns, st_size):
+    # decrypt_all re-reads and re-decrypts only files that changed since they were cached
+    _config_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], str, HummingbotAPIConfigAdapter]] = {}
+    _config_cache_secrets_manager: Optional[BaseSecretsManager] = None
+    # Encrypted password verification word, tagged with the verification file's (st_mtime_ns, st_size)
+    _verification_cache: Optional[Tuple[Tuple[int, int], str]] = None
+    # Secrets manager that last passed validation and the encrypted word it was checked against
+    _validated_password: Optional[Tuple[BaseSecretsManager, str]] = None
+
     @classmethod
     def login_account(cls, account_name: str, secrets_manager: BaseSecretsManager) -> bool:
         if not cls.validate_password(secrets_manager):
@@ -28,11 +50,35 @@ class BackendAPISecurity(Security):
     def decrypt_all(cls, account_name: str = "master_account"):
         cls._secure_configs.clear()
         cls._decryption_done.clear()
-        encrypted_files = [file for file in fs_util.list_files(directory=f"credentials/{account_name}/connectors") if
-                           file.endswith(".yml")]
-        for file in encrypted_files:
-            path = Path(fs_util.base_path + f"/credentials/{account_name}/connectors/" + file)
-            cls.decrypt_connector_config(path)
+        if cls._config_cache_secrets_manager is not cls.secrets_manager:
+            # Cached values were decrypted with another secrets manager
+            cls._config_cache.clear()
+            cls._config_cache_secrets_manager = cls.secrets_manager
+        # scandir filters by suffix before any stat call and its entries carry the stat used for the cache check
+        with os.scandir(fs_util.base_path + f"/credentials/{account_name}/connectors") as entries:
+            encrypted_files = [entry for entry in entries if entry.name.endswith(".yml") and entry.is_file()]
+        stale = []
+        for entry in encrypted_files:
+            path = Path(entry.path)
+            stat = entry.stat()
+            version = (stat.st_mtime_ns, stat.st_size)
+            cache_key = (account_name, entry.name)
+            cached = cls._config_cache.get(cache_key)
+            if cached is not None and cached[0] == version:
+                cls._secure_configs[cached[1]] = cached[2]
+            else:
+                stale.append((cache_key, version, path))
+        if len(stale) > 1:
+            # Key derivation and decryption run in native code that releases the GIL, so files decrypt in parallel
+            with ThreadPoolExecutor(max_workers=min(8, len(stale))) as executor:
+                config_maps = list(executor.map(cls.load_connector_config_map_from_file,
+                                                [path for _, _, path in stale]))
+        else:
+            config_maps = [cls.load_connector_config_map_from_file(path) for _, _, path in stale]
+        for (cache_key, version, path), config_map in zip(stale, config_maps):
+            connector_name = connector_name_from_file(path)
+            cls._secure_configs[connector_name] = config_map
+            cls._config_cache[cache_key] = (version, connector_name, config_map)
         cls._decryption_done.set()
 
     @classmethod
@@ -42,7 +88,7 @@ class BackendAPISecurity(Security):
 
     @classmethod
     def load_connector_config_map_from_file(cls, yml_path: Path) -> HummingbotAPIConfigAdapter:
-        config_data = read_yml_file(yml_path)
+        config_data = _read_yml_file(yml_path)
         connector_name = connector_name_from_file(yml_path)
         hb_config = get_connector_hb_config(connector_name).model_validate(config_data)
         config_map = HummingbotAPIConfigAdapter(hb_config)
@@ -63,18 +109,28 @@ class BackendAPISecurity(Security):
         full_path = fs_util._get_full_path(settings.app.password_verification_path)
         return not Path(full_path).exists()
 
-    @staticmethod
-    def validate_password(secrets_manager: BaseSecretsManager) -> bool:
+    @classmethod
+    def validate_password(cls, secrets_manager: BaseSecretsManager) -> bool:
         valid = False
-        full_path = fs_util._get_full_path(settings.app.password_verification_path)
-        with open(full_path, "r") as f:
-            encrypted_word = f.read()
+        full_path = Path(fs_util._get_full_path(settings.app.password_verification_path))
+        stat = full_path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        if cls._verification_cache is not None and cls._verification_cache[0] == version:
+            encrypted_word = cls._verification_cache[1]
+        else:
+            encrypted_word = full_path.read_text()
+            cls._verification_cache = (version, encrypted_word)
+        validated = cls._validated_password
+        if validated is not None and validated[0] is secrets_manager and validated[1] == encrypted_word:
+            return True
         try:
             decrypted_word = secrets_manager.decrypt_secret_value(PASSWORD_VERIFICATION_WORD, encrypted_word)
             valid = decrypted_word == PASSWORD_VERIFICATION_WORD
         except ValueError as e:
             if str(e) != "MAC mismatch":
                 raise e
+        if valid:
+            cls._validated_password = (secrets_manager, encrypted_word)
         return valid
 
     @staticmethod